@@ -6,18 +6,11 @@
 # containing dir.
 
 import os
-import re
+import sys
+
+sys.path.insert(0, os.path.abspath('../..'))
 
-def get_version():
-    """
-    Extracts the version number from the version.py file.
-    """
-    VERSION_FILE = '../../localized_recurrence/version.py'
-    mo = re.search(r'^__version__ = [\'"]([^\'"]*)[\'"]', open(VERSION_FILE, 'rt').read(), re.M)
-    if mo:
-        return mo.group(1)
-    else:
-        raise RuntimeError('Unable to find version string in {0}.'.format(VERSION_FILE))
+from localized_recurrence.version import __version__
 
 
 # -- General configuration ------------------------------------------------
@@ -44,9 +37,9 @@ project = u'Django Localized Recurrence'
 copyright = u'2014, Erik Swanson'
 
 # The short X.Y version.
-version = get_version()
+version = __version__
 # The full version, including alpha/beta/rc tags.
-release = get_version()
+release = __version__
 
 exclude_patterns = ['_build']
 
@@ -59,17 +52,13 @@ intersphinx_mapping = {
 
 # -- Options for HTML output ----------------------------------------------
 
-html_theme = 'default'
+# sphinx_rtd_theme registers itself with Sphinx, so it does not need to be
+# imported here to be found.
+html_theme = 'sphinx_rtd_theme'
 
 # Add any paths that contain custom themes here, relative to this directory.
 #html_theme_path = []
 
-on_rtd = os.environ.get('READTHEDOCS', None) == 'True'
-if not on_rtd:  # only import and set the theme if we're building docs locally
-    import sphinx_rtd_theme
-    html_theme = 'sphinx_rtd_theme'
-    html_theme_path = [sphinx_rtd_theme.get_html_theme_path()]
-
 # Add any paths that contain custom static files (such as style sheets) here,
 # relative to this directory. They are copied after the builtin static files,
 # so a file named "default.css" will overwrite the builtin "default.css".
@@ -134,7 +123,5 @@ texinfo_documents = [
 ]
 
 # -- Django configuration -------------------------------------------------
-import sys
-sys.path.insert(0, os.path.abspath('../..'))
 from settings import configure_settings
 configure_settings()
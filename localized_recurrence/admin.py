@@ -4,14 +4,16 @@ from localized_recurrence.models import LocalizedRecurrence
 
 
 class LocalizedRecurrenceAdmin(ModelAdmin):
-    list_display = [
+    list_display = (
         'id',
         'interval',
         'timezone',
         'offset',
         'previous_scheduled',
         'next_scheduled',
-    ]
+    )
+    list_per_page = 50
+    show_full_result_count = False
 
 
 site.register(LocalizedRecurrence, LocalizedRecurrenceAdmin)
@@ -1,8 +1,25 @@
 from datetime import timedelta
+from functools import lru_cache
 import re
 
 from django.db.models.fields import IntegerField
-from ambition_utils.fields import CastOnAssignFieldMixin
+from ambition_utils.fields import CastOnAssignDescriptor, CastOnAssignFieldMixin
+
+
+_DAYS_RE = re.compile(
+    r"(?P<days>-?[0-9]+) days?, (?P<hours>[0-9]+):(?P<minutes>[0-9]+):(?P<seconds>[0-9]+(?:\.[0-9]+)?)"
+)
+
+
+class DurationDescriptor(CastOnAssignDescriptor):
+    """Casts assignments to a DurationField, skipping ``to_python`` for
+    values that are already timedeltas (or ``None``).
+    """
+    def __set__(self, obj, value):
+        if value is None or value.__class__ is timedelta:
+            obj.__dict__[self.field.name] = value
+        else:
+            obj.__dict__[self.field.name] = self.field.to_python(value)
 
 
 class DurationField(CastOnAssignFieldMixin, IntegerField):
@@ -41,29 +58,37 @@ class DurationField(CastOnAssignFieldMixin, IntegerField):
         """Call out to the super. Makes docs cleaner."""
         return super().__init__(*args, **kwargs)
 
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        """Install the duration specific cast-on-assign descriptor.
+        """
+        super().contribute_to_class(cls, name, *args, **kwargs)
+        setattr(cls, name, DurationDescriptor(self))
+
     def to_python(self, value):
         """Convert a stored duration into a python datetime.timedelta object.
 
         Need to handle three cases:
+            - What the database returns (integer).
             - An instance of the correct type (timedelta).
             - A string (e.g., from a deserializer).
-            - What the database returns (integer).
+
+        Values are dispatched on their exact type first. Subclasses of the
+        supported types are rare, so they are only checked with isinstance
+        when the direct lookup misses.
         """
+        if value is None or value.__class__ is timedelta:
+            return value
+
+        convert = _CONVERTERS.get(value.__class__)
+        if convert is not None:
+            return convert(value)
+
         if isinstance(value, timedelta):
-            v = value
-        elif isinstance(value, (bytes, str)):
-            # The string should be in the form "[D day[s],][H]H:MM:SS[.UUUUUU]"
-            try:
-                v = parse_timedelta_string(value)
-            except ValueError:
-                raise ValueError("Duration string must be in the form '[D day[s],][H]H:MM:SS[.UUUUUU]'")
-        elif isinstance(value, int):
-            v = timedelta(seconds=value)
-        elif value is None:
-            v = None
-        else:
-            raise ValueError("Not a valid Duration object")
-        return v
+            return value
+        for value_type, convert in _CONVERTERS.items():
+            if isinstance(value, value_type):
+                return convert(value)
+        raise ValueError("Not a valid Duration object")
 
     def deconstruct(self):
         name, path, args, kwargs = super(DurationField, self).deconstruct()
@@ -73,17 +98,60 @@ class DurationField(CastOnAssignFieldMixin, IntegerField):
 
     def get_prep_value(self, value):
         """Convert a timedelta to integer for storage.
+
+        Integers are already in storage form and timedeltas are
+        converted without a float round-trip, which keeps long durations
+        exact. ``timedelta`` normalizes seconds to ``[0, 86400)`` and
+        carries the sign in days, so negative durations work as well.
+        Sub-second parts are truncated toward zero, the same as
+        ``int(value.total_seconds())``. Anything else goes through
+        ``to_python`` first. ``None`` is stored as null.
         """
-        value = self.to_python(value)
-        return int(value.total_seconds())
+        if value is None or isinstance(value, int):
+            return value
+        if not isinstance(value, timedelta):
+            value = self.to_python(value)
+        seconds = value.days * 86400 + value.seconds
+        if seconds < 0 and value.microseconds:
+            seconds += 1
+        return seconds
 
     def value_to_string(self, obj):
         """Used by serializers to get a string representation.
         """
-        time_delta_value = self._get_val_from_obj(obj)
+        time_delta_value = self.value_from_object(obj)
         return str(time_delta_value)
 
 
+@lru_cache(maxsize=256)
+def _timedelta_from_seconds(seconds):
+    """Converts stored seconds into a timedelta.
+
+    Stored offsets are highly repetitive, and timedeltas are immutable,
+    so the same instance can safely be handed out for repeat values.
+    """
+    return timedelta(seconds=seconds)
+
+
+def _string_to_timedelta(value):
+    """Converts a string in the form "[D day[s],][H]H:MM:SS[.UUUUUU]" into a timedelta.
+    """
+    try:
+        return parse_timedelta_string(value)
+    except (ValueError, OverflowError):
+        raise ValueError("Duration string must be in the form '[D day[s],][H]H:MM:SS[.UUUUUU]'")
+
+
+def _bytes_to_timedelta(value):
+    """Converts a bytestring in the form "[D day[s],][H]H:MM:SS[.UUUUUU]" into a timedelta.
+
+    Non-ascii bytes can never be part of a valid duration, so they are
+    replaced and rejected by the string parsing.
+    """
+    return _string_to_timedelta(value.decode('ascii', 'replace'))
+
+
+@lru_cache(maxsize=1024)
 def parse_timedelta_string(string):
     """Parses strings from datetime.timedelta.__str__.
 
@@ -92,14 +160,46 @@ def parse_timedelta_string(string):
 
     datetime.timedelta.__str__ returns a string in the form [D day[s],
     ][H]H:MM:SS[.UUUUUU], where D is negative for negative t.
+
+    Serialized durations repeat heavily, so parsed results are cached.
     """
-    days_re = r"(?P<days>-?[0-9]*) days?, (?P<hours>[0-9]+):(?P<minutes>[0-9]+):(?P<seconds>[0-9]+\.?[0-9]*)"
-    no_days_re = r"(?P<hours>[0-9]+):(?P<minutes>[0-9]+):(?P<seconds>[0-9]+\.?[0-9]*)"
-    match_days = re.match(days_re, string)
-    match_no_days = re.match(no_days_re, string)
-    if match_days:
-        return timedelta(**{k: float(v) for k, v in match_days.groupdict().items()})
-    elif match_no_days:
-        return timedelta(**{k: float(v) for k, v in match_no_days.groupdict().items()})
-    else:
+    # Every valid form has a colon, so reject anything else without running a regex
+    if ':' not in string:
         raise ValueError("'%s' is not in the form [D day[s],][H]H:MM:SS[.UUUUUU]" % string)
+
+    if ' day' in string:
+        match_days = _DAYS_RE.fullmatch(string)
+        if match_days:
+            groups = match_days.groupdict()
+            return timedelta(
+                days=int(groups['days']),
+                hours=int(groups['hours']),
+                minutes=int(groups['minutes']),
+                seconds=float(groups['seconds']),
+            )
+    else:
+        # The no-days form is rigid enough to parse without a regex. Only plain digits are accepted, since int
+        # and float would also take signs, whitespace, underscores, exponents and inf
+        parts = string.split(':')
+        if len(parts) == 3:
+            hours, minutes, seconds = parts
+            whole_seconds, point, fraction = seconds.partition('.')
+            digit_parts = (hours, minutes, whole_seconds, fraction) if point else (hours, minutes, whole_seconds)
+            if all(_is_digits(part) for part in digit_parts):
+                return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+
+    raise ValueError("'%s' is not in the form [D day[s],][H]H:MM:SS[.UUUUUU]" % string)
+
+
+def _is_digits(string):
+    """Checks that a string is made up of one or more ascii digits.
+    """
+    return string.isascii() and string.isdigit()
+
+
+# Converters for each supported stored or serialized duration type, keyed by type
+_CONVERTERS = {
+    int: _timedelta_from_seconds,
+    str: _string_to_timedelta,
+    bytes: _bytes_to_timedelta,
+}
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import ambition_utils.fields
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Creates the final LocalizedRecurrence schema in one step for new databases instead of creating the integer
+    offset column, copying it into a native duration column and swapping the two.
+    """
+
+    replaces = [
+        ('localized_recurrence', '0001_initial'),
+        ('localized_recurrence', '0002_localizedrecurrence_offset2'),
+        ('localized_recurrence', '0003_offset_data_migration'),
+        ('localized_recurrence', '0004_auto_20161108_2151'),
+    ]
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalizedRecurrence',
+            fields=[
+                ('id', models.AutoField(serialize=False, primary_key=True, auto_created=True, verbose_name='ID')),
+                ('interval', models.CharField(default='DAY', choices=[('DAY', 'Day'), ('WEEK', 'Week'), ('MONTH', 'Month'), ('QUARTER', 'Quarter'), ('YEAR', 'Year')], max_length=18)),
+                ('offset', models.DurationField(default=datetime.timedelta(0))),
+                ('timezone', ambition_utils.fields.TimeZoneField(default='UTC')),
+                ('previous_scheduled', models.DateTimeField(default=datetime.datetime(1970, 1, 1, 0, 0))),
+                ('next_scheduled', models.DateTimeField(default=datetime.datetime(1970, 1, 1, 0, 0))),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
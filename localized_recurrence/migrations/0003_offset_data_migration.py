@@ -1,16 +1,24 @@
 # -*- coding: utf-8 -*-
 
 
-from datetime import timedelta
 from django.db import migrations
 
 
 def migrate_integers_to_intervals(apps, schema_editor):
     # Migrate custom DurationField values to Django's Native DurationField values
     LocalizedRecurrence = apps.get_model('localized_recurrence', 'LocalizedRecurrence')
-    for lr in LocalizedRecurrence.objects.all():
+
+    # The columns have different types, so copy the converted values in bulk rather than saving each row
+    batch = []
+    for lr in LocalizedRecurrence.objects.only('id', 'offset').iterator(chunk_size=2000):
         lr.offset2 = lr.offset
-        lr.save()
+        batch.append(lr)
+        if len(batch) >= 2000:
+            LocalizedRecurrence.objects.bulk_update(batch, ['offset2'], batch_size=1000)
+            batch = []
+
+    if batch:
+        LocalizedRecurrence.objects.bulk_update(batch, ['offset2'], batch_size=1000)
 
 
 class Migration(migrations.Migration):
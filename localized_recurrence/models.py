@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import calendar
 
 from dateutil.relativedelta import relativedelta
@@ -16,6 +17,18 @@ INTERVAL_CHOICES = (
     ('YEAR', 'Year'),
 )
 
+# The number of recurrences to write per update query when updating schedules
+UPDATE_BATCH_SIZE = 10000
+
+# The amount of time to add to move a recurrence forward by one interval
+ADDITIONAL_TIME = {
+    'DAY': timedelta(days=1),
+    'WEEK': timedelta(weeks=1),
+    'MONTH': relativedelta(months=1),
+    'QUARTER': relativedelta(months=3),
+    'YEAR': relativedelta(years=1),
+}
+
 
 class LocalizedRecurrenceQuerySet(models.query.QuerySet):
     def update_schedule(self, time=None):
@@ -41,9 +54,21 @@ class LocalizedRecurrenceQuerySet(models.query.QuerySet):
 
         Calling this function has the side effect that the
         ``next_scheduled`` attribute of every recurrence in the
-        queryset will be updated to the new time in utc.
+        queryset will be updated to the new time in utc. Recurrences
+        that are not due yet are left untouched.
         """
-        _update_schedule(self, time=time)
+        time = time or datetime.utcnow()
+
+        # Update the instances the caller already has when the queryset has been evaluated, otherwise stream
+        # the due recurrences rather than loading the whole queryset into memory
+        if self._result_cache is not None:
+            recurrences = self
+        elif not self.query.is_sliced and not self.query.combinator:
+            recurrences = self.filter(next_scheduled__lte=time).iterator(chunk_size=2000)
+        else:
+            # Sliced and combined querysets can not be filtered further, so those are checked as they stream
+            recurrences = self.iterator(chunk_size=2000)
+        _update_schedule((recurrence for recurrence in recurrences if recurrence.next_scheduled <= time), time=time)
 
 
 class LocalizedRecurrenceManager(models.Manager):
@@ -64,7 +89,8 @@ class LocalizedRecurrenceManager(models.Manager):
 
         Calling this function has the side effect that the
         ``next_scheduled`` attribute of every recurrence will be
-        updated to the new time in utc.
+        updated to the new time in utc. Recurrences that are not due
+        yet are left untouched.
         """
         self.get_queryset().update_schedule(time=time)
 
@@ -129,14 +155,26 @@ class LocalizedRecurrence(models.Model):
     objects = LocalizedRecurrenceManager()
 
     def __str__(self):
-        return 'ID: {0}, Interval: {1}, Next Scheduled: {2}'.format(self.id, self.interval, self.next_scheduled)
+        return f'ID: {self.id}, Interval: {self.interval}, Next Scheduled: {self.next_scheduled}'
 
     def update(self, **updates):
-        """Updates fields in the localized recurrence."""
+        """Updates fields in the localized recurrence.
+
+        Recurrences loaded from the database only write the updated
+        fields. New recurrences, including ones created with an explicit
+        primary key, and updates that set attributes which are not
+        fields, save the whole recurrence. A loaded recurrence whose row
+        has since been deleted raises a ``DatabaseError`` rather than
+        being inserted again.
+        """
         for update in updates:
             setattr(self, update, updates[update])
 
-        return self.save()
+        # Only write the changed columns of recurrences that were loaded from the database
+        field_names = {field.attname for field in self._meta.concrete_fields}
+        if self.pk is None or self._state.adding or not updates or not updates.keys() <= field_names:
+            return self.save()
+        return self.save(update_fields=updates.keys())
 
     def update_schedule(self, time=None):
         """
@@ -165,58 +203,74 @@ class LocalizedRecurrence(models.Model):
         without persisting an update to the schedule, this function
         can be called without side-effect.
         """
-        # Make a copy of the next scheduled datetime
-        next_scheduled_utc = datetime(
-            self.next_scheduled.year, self.next_scheduled.month, self.next_scheduled.day,
-            self.next_scheduled.hour, self.next_scheduled.minute, self.next_scheduled.second
-        )
+        return _utc_of_next_schedule(self.interval, self.offset, self.timezone, self.next_scheduled, current_time)
 
-        additional_time = {
-            'DAY': timedelta(days=1),
-            'WEEK': timedelta(weeks=1),
-            'MONTH': relativedelta(months=1),
-            'QUARTER': relativedelta(months=3),
-            'YEAR': relativedelta(years=1),
-        }
-
-        # Keep updating next scheduled to the next recurrence until it is greater than current time
-        while next_scheduled_utc <= current_time:
-            # Convert to local time
-            next_scheduled_local = fleming.convert_to_tz(next_scheduled_utc, self.timezone)
-
-            # Replace with the offset data
-            replaced_with_offset = _replace_with_offset(next_scheduled_local, self.offset, self.interval)
-
-            # Normalize to handle dst
-            local_scheduled_time = fleming.fleming.dst_normalize(replaced_with_offset)
-
-            # Add the time delta
-            next_local_scheduled_time = fleming.add_timedelta(
-                local_scheduled_time,
-                additional_time[self.interval],
-                within_tz=self.timezone
-            )
 
-            # Check if last day of month
-            is_last_day = self.interval == 'MONTH' and self.offset.days >= 28
+@lru_cache(maxsize=4096)
+def _utc_of_next_schedule(interval, offset, timezone, next_scheduled, current_time):
+    """
+    Generates the next recurrence time in utc after the current time.
+
+    All of the arguments are hashable, so results are cached. Recurrences
+    that share a schedule are commonly updated together with the same
+    current time, so they only need to be computed once.
+    """
+    # Make a copy of the next scheduled datetime
+    next_scheduled_utc = datetime(
+        next_scheduled.year, next_scheduled.month, next_scheduled.day,
+        next_scheduled.hour, next_scheduled.minute, next_scheduled.second
+    )
+
+    # The interval and offset do not change between iterations, so only work out what they imply once
+    replace = _get_replacer(interval)
+    offset_parts = _split_offset(offset)
+    additional_time = ADDITIONAL_TIME[interval]
+
+    # Monthly offsets this far into the month land on the last day of each month
+    is_last_day = interval == 'MONTH' and offset.days >= 28
+
+    # Each step only depends on the interval the previous time falls in, so a recurrence that has fallen
+    # far behind (e.g. one still at its 1970 default) can start a couple of intervals before the current
+    # time instead of stepping through every interval in between
+    catch_up_time = current_time - 2 * additional_time
+    if next_scheduled_utc < catch_up_time:
+        next_scheduled_utc = catch_up_time
+
+    # Keep updating next scheduled to the next recurrence until it is greater than current time
+    while next_scheduled_utc <= current_time:
+        # Convert to local time
+        next_scheduled_local = next_scheduled_utc.replace(tzinfo=pytz.utc).astimezone(timezone)
+
+        # Replace with the offset data
+        replaced_with_offset = replace(next_scheduled_local, *offset_parts)
+
+        # Normalize to handle dst
+        local_scheduled_time = fleming.fleming.dst_normalize(replaced_with_offset)
+
+        # Add the time delta
+        next_local_scheduled_time = fleming.add_timedelta(
+            local_scheduled_time,
+            additional_time,
+            within_tz=timezone
+        )
 
-            # Check if we need to manually set the day to the next month's last day rather than apply the offset info
-            if self.interval == 'MONTH' and is_last_day:
-                _, last_day_of_next_month = calendar.monthrange(
-                    next_local_scheduled_time.year,
-                    next_local_scheduled_time.month
-                )
+        # Check if we need to manually set the day to the next month's last day rather than apply the offset info
+        if is_last_day:
+            last_day_of_next_month = _days_in_month(
+                next_local_scheduled_time.year,
+                next_local_scheduled_time.month
+            )
 
-                # Replace day with last day of month
-                next_local_scheduled_time = next_local_scheduled_time.replace(day=last_day_of_next_month)
-            else:
-                # Apply the offset info for all cases that are not end of month
-                next_local_scheduled_time = _replace_with_offset(next_local_scheduled_time, self.offset, self.interval)
+            # Replace day with last day of month
+            next_local_scheduled_time = next_local_scheduled_time.replace(day=last_day_of_next_month)
+        else:
+            # Apply the offset info for all cases that are not end of month
+            next_local_scheduled_time = replace(next_local_scheduled_time, *offset_parts)
 
-            # Convert back to utc
-            next_scheduled_utc = fleming.convert_to_tz(next_local_scheduled_time, pytz.utc, return_naive=True)
+        # Convert back to utc
+        next_scheduled_utc = next_local_scheduled_time.astimezone(pytz.utc).replace(tzinfo=None)
 
-        return next_scheduled_utc
+    return next_scheduled_utc
 
 
 def _update_schedule(recurrences, time=None):
@@ -224,10 +278,38 @@ def _update_schedule(recurrences, time=None):
     Update the schedule times for all the provided recurrences.
     """
     time = time or datetime.utcnow()
+    to_update = []
     for recurrence in recurrences:
         recurrence.next_scheduled = recurrence.utc_of_next_schedule(time)
         recurrence.previous_scheduled = time
-        recurrence.save()
+
+        # Recurrences that have never been saved need to be inserted
+        if recurrence.pk is None:
+            recurrence.save()
+        else:
+            to_update.append(recurrence)
+
+        # Write the new schedules in batches rather than saving each recurrence
+        if len(to_update) >= UPDATE_BATCH_SIZE:
+            _bulk_update_schedule(to_update)
+            to_update = []
+
+    _bulk_update_schedule(to_update)
+
+
+def _bulk_update_schedule(recurrences):
+    """
+    Persist the schedule fields of already saved recurrences.
+
+    The recurrences are written to the database they were loaded from,
+    the same as saving each of them would.
+    """
+    if not recurrences:
+        return
+
+    LocalizedRecurrence.objects.db_manager(recurrences[0]._state.db).bulk_update(
+        recurrences, ['next_scheduled', 'previous_scheduled'], batch_size=UPDATE_BATCH_SIZE
+    )
 
 
 def _replace_with_offset(dt, offset, interval):
@@ -238,28 +320,79 @@ def _replace_with_offset(dt, offset, interval):
     the final result, will the be a datetime, at the desired offset
     given the interval.
     """
-    hours, minutes, seconds = offset.seconds // 3600, (offset.seconds // 60) % 60, offset.seconds % 60
-    interval = interval.lower()
-    if interval == 'day':
-        dt_out = dt.replace(hour=hours, minute=minutes, second=seconds)
-    elif interval == 'week':
-        dt_out = dt + timedelta(days=offset.days - dt.weekday())
-        dt_out = dt_out.replace(hour=hours, minute=minutes, second=seconds)
-    elif interval == 'month':
-        _, last_day = calendar.monthrange(dt.year, dt.month)
-        day = (offset.days + 1) if (offset.days + 1) <= last_day else last_day
-        dt_out = dt.replace(day=day, hour=hours, minute=minutes, second=seconds)
-    elif interval == 'quarter':
-        month_range = [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]][int((dt.month - 1) / 3)]
-        quarter_days = sum(calendar.monthrange(dt.year, month)[1] for month in month_range)
-        days = offset.days if offset.days <= (quarter_days - 1) else (quarter_days - 1)
-        dt_out = fleming.floor(dt, month=3).replace(hour=hours, minute=minutes, second=seconds)
-        dt_out += timedelta(days)
-    elif interval == 'year':
-        leap_year_extra_days = 1 if calendar.isleap(dt.year) else 0
-        days = offset.days if offset.days <= 364 + leap_year_extra_days else 364 + leap_year_extra_days
-        dt_out = fleming.floor(dt, year=1).replace(hour=hours, minute=minutes, second=seconds)
-        dt_out += timedelta(days)
-    else:
+    return _get_replacer(interval)(dt, *_split_offset(offset))
+
+
+def _get_replacer(interval):
+    """
+    Get the function that replaces datetime components for an interval.
+    """
+    try:
+        return _INTERVAL_REPLACERS[interval]
+    except KeyError:
         raise ValueError('{i} is not a proper interval value'.format(i=interval))
-    return dt_out
+
+
+def _split_offset(offset):
+    """
+    Split an offset into the hours, minutes, seconds and days used to
+    replace datetime components.
+    """
+    hours, remainder = divmod(offset.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return hours, minutes, seconds, offset.days
+
+
+@lru_cache(maxsize=4096)
+def _days_in_month(year, month):
+    """
+    Get the number of days in a month.
+    """
+    return calendar.monthrange(year, month)[1]
+
+
+@lru_cache(maxsize=4096)
+def _days_in_quarter(year, quarter):
+    """
+    Get the number of days in a zero indexed quarter of a year.
+    """
+    return sum(_days_in_month(year, month) for month in range(quarter * 3 + 1, quarter * 3 + 4))
+
+
+def _replace_day(dt, hours, minutes, seconds, days):
+    return dt.replace(hour=hours, minute=minutes, second=seconds)
+
+
+def _replace_week(dt, hours, minutes, seconds, days):
+    day = date.fromordinal(dt.toordinal() + days - dt.weekday())
+    return dt.replace(year=day.year, month=day.month, day=day.day, hour=hours, minute=minutes, second=seconds)
+
+
+def _replace_month(dt, hours, minutes, seconds, days):
+    last_day = _days_in_month(dt.year, dt.month)
+    day = (days + 1) if (days + 1) <= last_day else last_day
+    return dt.replace(day=day, hour=hours, minute=minutes, second=seconds)
+
+
+def _replace_quarter(dt, hours, minutes, seconds, days):
+    quarter_days = _days_in_quarter(dt.year, (dt.month - 1) // 3)
+    days = days if days <= (quarter_days - 1) else (quarter_days - 1)
+    dt_out = fleming.floor(dt, month=3).replace(hour=hours, minute=minutes, second=seconds)
+    return dt_out + timedelta(days)
+
+
+def _replace_year(dt, hours, minutes, seconds, days):
+    leap_year_extra_days = 1 if calendar.isleap(dt.year) else 0
+    days = days if days <= 364 + leap_year_extra_days else 364 + leap_year_extra_days
+    dt_out = fleming.floor(dt, year=1).replace(hour=hours, minute=minutes, second=seconds)
+    return dt_out + timedelta(days)
+
+
+# Replacement functions for each interval, keyed by the stored interval value
+_INTERVAL_REPLACERS = {
+    'DAY': _replace_day,
+    'WEEK': _replace_week,
+    'MONTH': _replace_month,
+    'QUARTER': _replace_quarter,
+    'YEAR': _replace_year,
+}
@@ -1,27 +1,30 @@
 from django.contrib.admin.sites import AdminSite
-from django.test import TestCase
+from django.test import SimpleTestCase
 
 from localized_recurrence.admin import LocalizedRecurrenceAdmin
 from localized_recurrence.models import LocalizedRecurrence
 
 
-class LocalizedRecurrenceAdminTest(TestCase):
+class LocalizedRecurrenceAdminTest(SimpleTestCase):
     """Verify that the admin can load.
     """
-    def setUp(self):
-        super(LocalizedRecurrenceAdminTest, self).setUp()
-        self.site = AdminSite()
+    @classmethod
+    def setUpClass(cls):
+        super(LocalizedRecurrenceAdminTest, cls).setUpClass()
+        cls.site = AdminSite()
+        cls.lr_admin = LocalizedRecurrenceAdmin(LocalizedRecurrence, cls.site)
 
     def test_model_admin_load(self):
-        lr_admin = LocalizedRecurrenceAdmin(LocalizedRecurrence, self.site)
         self.assertEqual(
-            lr_admin.list_display,
-            [
+            self.lr_admin.list_display,
+            (
                 'id',
                 'interval',
                 'timezone',
                 'offset',
                 'previous_scheduled',
-                'next_scheduled'
-            ]
+                'next_scheduled',
+            )
         )
+        self.assertEqual(self.lr_admin.list_per_page, 50)
+        self.assertFalse(self.lr_admin.show_full_result_count)
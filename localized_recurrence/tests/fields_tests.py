@@ -1,9 +1,9 @@
 import unittest
 from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
 
-import django
-from importlib import reload
-from unittest.mock import MagicMock, patch
+from django.db import models
 
 from localized_recurrence import fields
 
@@ -19,32 +19,15 @@ class DurationFieldToPythonTest(unittest.TestCase):
         """
         Test .deconstruct() with a default
         """
-        if django.VERSION[1] >= 7:  # pragma: no cover
-            name, path, args, kwargs = self.df_with_default.deconstruct()
-
-            self.assertEqual(kwargs['default'], 60)
-        else:  # pragma: no cover
-            with patch('localized_recurrence.fields.IntegerField.deconstruct', create=True) as mock_deconstruct:
-                mock_deconstruct.return_value = (
-                    'duration', 'django.db.models.IntegerField', [], {'default': timedelta(seconds=60)}
-                )
-                name, path, args, kwargs = self.df_with_default.deconstruct()
-                self.assertEqual(kwargs['default'], 60)
+        name, path, args, kwargs = self.df_with_default.deconstruct()
+        self.assertEqual(kwargs['default'], 60)
 
     def test_deconstruct_without_default(self):
         """
         Test .deconstruct() without a default
         """
-        if django.VERSION[1] >= 7:  # pragma: no cover
-            name, path, args, kwargs = self.df.deconstruct()
-            self.assertFalse('default' in kwargs.keys())
-        else:  # pragma: no cover
-            with patch('localized_recurrence.fields.IntegerField.deconstruct', create=True) as mock_deconstruct:
-                mock_deconstruct.return_value = (
-                    'duration', 'django.db.models.IntegerField', [], {}
-                )
-                name, path, args, kwargs = self.df_with_default.deconstruct()
-                self.assertNotIn('default', kwargs.keys())
+        name, path, args, kwargs = self.df.deconstruct()
+        self.assertNotIn('default', kwargs.keys())
 
     def test_timedelta(self):
         """A timedelta should just get returned.
@@ -53,6 +36,16 @@ class DurationFieldToPythonTest(unittest.TestCase):
         td_out = self.df.to_python(td_in)
         self.assertEqual(td_out, td_in)
 
+    def test_timedelta_subclass(self):
+        """Subclasses of timedelta should also get returned.
+        """
+        class SubTimedelta(timedelta):
+            pass
+
+        td_in = SubTimedelta(hours=3)
+        td_out = self.df.to_python(td_in)
+        self.assertIs(td_out, td_in)
+
     def test_string(self):
         """A string should be properly converted.
         """
@@ -61,6 +54,13 @@ class DurationFieldToPythonTest(unittest.TestCase):
         td_out = self.df.to_python(str_in)
         self.assertEqual(td_out, td_expected)
 
+    def test_bytes(self):
+        """Bytestrings are decoded and converted like strings.
+        """
+        self.assertEqual(self.df.to_python(b'1:00:00'), timedelta(hours=1))
+        with self.assertRaises(ValueError):
+            self.df.to_python(b'1:00:\xff')
+
     def test_bad_string(self):
         """Malformed strings should raise an error.
         """
@@ -68,6 +68,12 @@ class DurationFieldToPythonTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.df.to_python(str_in)
 
+    def test_overflowing_string(self):
+        """Strings too large for a timedelta raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            self.df.to_python('999999999999:00:00')
+
     def test_int(self):
         """Int inputs should give timedelta outputs
         """
@@ -76,6 +82,15 @@ class DurationFieldToPythonTest(unittest.TestCase):
         td_out = self.df.to_python(int_in)
         self.assertEqual(td_out, td_expected)
 
+    def test_int_subclass(self):
+        """Subclasses of int should be converted like ints
+        """
+        class SubInt(int):
+            pass
+
+        td_out = self.df.to_python(SubInt(60))
+        self.assertEqual(td_out, timedelta(minutes=1))
+
     def test_none(self):
         """Null input -> None output
         """
@@ -91,6 +106,43 @@ class DurationFieldToPythonTest(unittest.TestCase):
             self.df.to_python(td_in)
 
 
+class DurationDescriptorTest(unittest.TestCase):
+    def setUp(self):
+        """Attach a descriptor for a DurationField to a plain object.
+        """
+        self.field = fields.DurationField()
+        self.field.name = 'duration'
+        self.descriptor = fields.DurationDescriptor(self.field)
+        self.obj = type('Obj', (), {})()
+
+    def test_installed_on_model(self):
+        """The field should install its own descriptor on the model.
+        """
+        class DurationModel(models.Model):
+            duration = fields.DurationField()
+
+            class Meta:
+                abstract = True
+                app_label = 'tests'
+
+        self.assertIsInstance(DurationModel.__dict__['duration'], fields.DurationDescriptor)
+
+    def test_timedelta_assigned_as_is(self):
+        """Timedeltas should be stored without conversion.
+        """
+        td_in = timedelta(hours=1)
+        with patch.object(self.field, 'to_python') as mock_to_python:
+            self.descriptor.__set__(self.obj, td_in)
+        self.assertFalse(mock_to_python.called)
+        self.assertIs(self.descriptor.__get__(self.obj), td_in)
+
+    def test_int_cast(self):
+        """Other values should be cast with to_python.
+        """
+        self.descriptor.__set__(self.obj, 60)
+        self.assertEqual(self.descriptor.__get__(self.obj), timedelta(minutes=1))
+
+
 class DurationFieldGetPrepValueTest(unittest.TestCase):
     def setUp(self):
         """Create a mock of the DurationField class and pin get_prep_value.
@@ -111,6 +163,40 @@ class DurationFieldGetPrepValueTest(unittest.TestCase):
         int_out = self.df.get_prep_value(td_in)
         self.assertTrue(isinstance(int_out, int))
 
+    def test_int_passes_through(self):
+        """Integers are already in storage form.
+        """
+        self.assertEqual(self.df.get_prep_value(3600), 3600)
+
+    def test_none(self):
+        """Null durations are stored as null.
+        """
+        self.assertIsNone(self.df.get_prep_value(None))
+
+    def test_string(self):
+        """Strings are converted through to_python.
+        """
+        self.assertEqual(self.df.get_prep_value('1 day, 0:00:01'), 86401)
+
+    def test_large_days(self):
+        """Long durations are converted exactly.
+        """
+        td_in = timedelta(days=100000, seconds=1)
+        self.assertEqual(self.df.get_prep_value(td_in), 8640000001)
+
+    def test_negative(self):
+        """Negative durations carry their sign in the days.
+        """
+        td_in = timedelta(hours=-12)
+        self.assertEqual(self.df.get_prep_value(td_in), -43200)
+
+    def test_negative_fraction(self):
+        """Negative durations with a fraction of a second are truncated toward zero.
+        """
+        self.assertEqual(self.df.get_prep_value(timedelta(seconds=-1.5)), -1)
+        self.assertEqual(self.df.get_prep_value(timedelta(microseconds=-1)), 0)
+        self.assertEqual(self.df.get_prep_value(timedelta(seconds=1.5)), 1)
+
     def test_round_trip(self):
         """A trip through get_prep_value and to_python.
         """
@@ -122,23 +208,17 @@ class DurationFieldGetPrepValueTest(unittest.TestCase):
 
 class DurationFieldValueToStringTest(unittest.TestCase):
     def setUp(self):
-        """Create a mock of the DurationField class and pin value_to_string to it.
-
-        We also mock out the _get_val_from_obj, to just return what is
-        passed in. Allows us to pass in a timedelta for testing intead
-        of the expected object.
+        """Create a DurationField and an object holding a duration for it.
         """
-        self.mock_DurationField = MagicMock()
-        self.mock_DurationField.value_to_string = fields.DurationField.__dict__['value_to_string']
-        self.mock_DurationField.to_python = fields.DurationField.__dict__['to_python']
-        self.mock_DurationField._get_val_from_obj.side_effect = lambda x: x
+        self.df = fields.DurationField()
+        self.df.set_attributes_from_name('duration')
+        self.obj = SimpleNamespace(duration=timedelta(days=1, hours=1, minutes=1, seconds=1))
 
     def test_simple_string(self):
         """
         """
-        in_td = timedelta(days=1, hours=1, minutes=1, seconds=1)
         expected_str = "1 day, 1:01:01"
-        out_str = self.mock_DurationField.value_to_string(self.mock_DurationField, in_td)
+        out_str = self.df.value_to_string(self.obj)
         self.assertEqual(out_str, expected_str)
 
     def test_loop_to_python(self):
@@ -146,10 +226,9 @@ class DurationFieldValueToStringTest(unittest.TestCase):
 
         We expect the value to be unchanged after the trip.
         """
-        in_td = timedelta(days=1, hours=1, minutes=1, seconds=1)
-        out_str = self.mock_DurationField.value_to_string(self.mock_DurationField, in_td)
-        out_td = self.mock_DurationField.to_python(self.mock_DurationField, out_str)
-        self.assertEqual(out_td, in_td)
+        out_str = self.df.value_to_string(self.obj)
+        out_td = self.df.to_python(out_str)
+        self.assertEqual(out_td, self.obj.duration)
 
 
 class ParseTimedeltaStringTest(unittest.TestCase):
@@ -161,39 +240,47 @@ class ParseTimedeltaStringTest(unittest.TestCase):
         We test so many things in this test because regular
         expressions represent a lot of effective branching.
         """
-        td1_in = timedelta(days=1)
-        td2_in = timedelta(seconds=1)
-        td3_in = timedelta(hours=1, minutes=1, seconds=1)
-        td4_in = timedelta(days=1, seconds=10000.001)
-        td5_in = timedelta(hours=12)
-        td6_in = timedelta(hours=-12)
-        str1_out = str(td1_in)
-        str2_out = str(td2_in)
-        str3_out = str(td3_in)
-        str4_out = str(td4_in)
-        str5_out = str(td5_in)
-        str6_out = str(td6_in)
-        td1_out = fields.parse_timedelta_string(str1_out)
-        td2_out = fields.parse_timedelta_string(str2_out)
-        td3_out = fields.parse_timedelta_string(str3_out)
-        td4_out = fields.parse_timedelta_string(str4_out)
-        td5_out = fields.parse_timedelta_string(str5_out)
-        td6_out = fields.parse_timedelta_string(str6_out)
-        self.assertEqual(td1_in, td1_out)
-        self.assertEqual(td2_in, td2_out)
-        self.assertEqual(td3_in, td3_out)
-        self.assertEqual(td4_in, td4_out)
-        self.assertEqual(td5_in, td5_out)
-        self.assertEqual(td6_in, td6_out)
-
-
-class SetupSouthTest(unittest.TestCase):
-    def test_no_south(self):
-        """This test is meant to hit the branch handleing the ImportError for
-        south.
-
-        Some users may not have south, so if it is not available, we
-        just pass.
-        """
-        with patch.dict('sys.modules', {'south.modelsinspector': {}}):
-            reload(fields)
+        tds_in = [
+            timedelta(days=1),
+            timedelta(seconds=1),
+            timedelta(hours=1, minutes=1, seconds=1),
+            timedelta(days=1, seconds=10000.001),
+            timedelta(hours=12),
+            timedelta(hours=-12),
+        ]
+        for td_in in tds_in:
+            with self.subTest(td=td_in):
+                self.assertEqual(td_in, fields.parse_timedelta_string(str(td_in)))
+
+    def test_missing_days(self):
+        """A days separator without a day count is malformed.
+        """
+        with self.assertRaises(ValueError):
+            fields.parse_timedelta_string(' days, 1:00:00')
+
+    def test_no_colon(self):
+        """Strings without a time component are rejected.
+        """
+        with self.assertRaises(ValueError):
+            fields.parse_timedelta_string('3 days')
+
+    def test_bad_days(self):
+        """Malformed strings with days are rejected.
+        """
+        with self.assertRaises(ValueError):
+            fields.parse_timedelta_string('3 days 1:00:00')
+
+    def test_trailing_garbage(self):
+        """Trailing characters after a valid duration are rejected.
+        """
+        with self.assertRaises(ValueError):
+            fields.parse_timedelta_string('1 day, 0:00:00 EXTRA')
+        with self.assertRaises(ValueError):
+            fields.parse_timedelta_string('0:00:00 EXTRA')
+
+    def test_not_plain_digits(self):
+        """Signs, whitespace, underscores, exponents and inf are rejected.
+        """
+        for string in ('-1:00:00', '+1:00:00', ' 1:00:00', '1:00:00 ', '1_0:00:00', '1:00:1e3', '0:00:inf', '0:00:1.'):
+            with self.subTest(string=string), self.assertRaises(ValueError):
+                fields.parse_timedelta_string(string)
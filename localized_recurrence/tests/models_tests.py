@@ -1,11 +1,21 @@
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
-from django.test import TestCase
-from django_dynamic_fixture import G
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 import pytz
 
 from ..models import LocalizedRecurrence, LocalizedRecurrenceQuerySet
-from ..models import _replace_with_offset, _update_schedule
+from ..models import _replace_with_offset, _update_schedule, _utc_of_next_schedule
+
+EASTERN = pytz.timezone('US/Eastern')
+CENTRAL = pytz.timezone('US/Central')
+HONG_KONG = pytz.timezone('Asia/Hong_Kong')
+BERLIN = pytz.timezone('Europe/Berlin')
+
+TIME_1203 = datetime(2013, 5, 20, 12, 3)
+TIME_1503 = datetime(2013, 5, 20, 15, 3)
 
 
 class LocalizedRecurrenceUpdateTest(TestCase):
@@ -18,23 +28,47 @@ class LocalizedRecurrenceUpdateTest(TestCase):
         self.assertIsNotNone(lr.id)
 
     def test_update_timezone(self):
-        lr = G(LocalizedRecurrence)
+        lr = LocalizedRecurrence.objects.create()
         lr.update(timezone='US/Eastern')
-        lr = LocalizedRecurrence.objects.get(id=lr.id)
-        self.assertEqual(lr.timezone, pytz.timezone('US/Eastern'))
+        lr.refresh_from_db(fields=['timezone'])
+        self.assertEqual(lr.timezone, EASTERN)
 
     def test_update_offset(self):
-        lr = G(LocalizedRecurrence)
+        lr = LocalizedRecurrence.objects.create()
         lr.update(offset=timedelta(seconds=1))
-        lr = LocalizedRecurrence.objects.get(id=lr.id)
+        lr.refresh_from_db(fields=['offset'])
+        self.assertEqual(lr.offset, timedelta(seconds=1))
+
+    def test_update_only_writes_updated_fields(self):
+        lr = LocalizedRecurrence.objects.create()
+        with CaptureQueriesContext(connection) as queries:
+            lr.update(offset=timedelta(seconds=1))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('offset', queries[0]['sql'])
+        self.assertNotIn('next_scheduled', queries[0]['sql'])
+
+    def test_update_non_field_attribute(self):
+        """Attributes that are not fields can still be set, with a full save.
+        """
+        lr = LocalizedRecurrence.objects.create()
+        lr.update(foo=2, offset=timedelta(seconds=1))
+        self.assertEqual(lr.foo, 2)
+        lr.refresh_from_db(fields=['offset'])
         self.assertEqual(lr.offset, timedelta(seconds=1))
 
+    def test_update_new_with_pk(self):
+        """New recurrences created with a primary key are inserted.
+        """
+        lr = LocalizedRecurrence(id=1000)
+        lr.update(offset=timedelta(seconds=1))
+        self.assertEqual(LocalizedRecurrence.objects.get(id=1000).offset, timedelta(seconds=1))
+
 
 class LocalizedRecurrenceQuerySetTest(TestCase):
     """Simple test to ensure the custom query set is being used.
     """
     def test_isinstance(self):
-        G(LocalizedRecurrence)
+        LocalizedRecurrence.objects.create()
         recurrences = LocalizedRecurrence.objects.all()
         self.assertIsInstance(recurrences, LocalizedRecurrenceQuerySet)
 
@@ -42,43 +76,79 @@ class LocalizedRecurrenceQuerySetTest(TestCase):
 class LocalizedRecurrenceQuerySetUpdateScheduleTest(TestCase):
     """Test that updates to recurrences are reflected in the DB.
     """
-    def setUp(self):
-        G(LocalizedRecurrence, interval='DAY', offset=timedelta(hours=12), timezone=pytz.timezone('US/Eastern'))
-        G(LocalizedRecurrence, interval='MONTH', offset=timedelta(hours=15), timezone=pytz.timezone('US/Eastern'))
+    @classmethod
+    def setUpTestData(cls):
+        LocalizedRecurrence.objects.bulk_create([
+            LocalizedRecurrence(interval='DAY', offset=timedelta(hours=12), timezone=EASTERN),
+            LocalizedRecurrence(interval='MONTH', offset=timedelta(hours=15), timezone=EASTERN),
+        ])
 
     def test_update_from_1970(self):
         """Start with next_scheduled of 1970, after update should be new.
         """
-        time = datetime(year=2013, month=5, day=20, hour=12, minute=3)
+        time = TIME_1203
         LocalizedRecurrence.objects.filter(interval='DAY').update_schedule(time=time)
-        lr_day = LocalizedRecurrence.objects.filter(interval='DAY').first()
-        self.assertGreater(lr_day.next_scheduled, time)
+        next_scheduled = LocalizedRecurrence.objects.filter(
+            interval='DAY').values_list('next_scheduled', flat=True).first()
+        self.assertGreater(next_scheduled, time)
+
+    def test_update_evaluated_queryset(self):
+        """Recurrences already loaded by the queryset are the ones updated.
+        """
+        time = TIME_1203
+        recurrences = LocalizedRecurrence.objects.all()
+        list(recurrences)
+        with self.assertNumQueries(1):
+            recurrences.update_schedule(time=time)
+        self.assertTrue(all(r.next_scheduled > time for r in recurrences))
+        self.assertFalse(LocalizedRecurrence.objects.filter(next_scheduled__lte=time).exists())
 
 
 class LocalizedRecurrenceManagerUpdateScheduleTest(TestCase):
-    def setUp(self):
-        G(LocalizedRecurrence, interval='DAY', offset=timedelta(hours=12), timezone=pytz.timezone('US/Eastern'))
-        G(LocalizedRecurrence, interval='MONTH', offset=timedelta(hours=15), timezone=pytz.timezone('US/Eastern'))
+    @classmethod
+    def setUpTestData(cls):
+        LocalizedRecurrence.objects.bulk_create([
+            LocalizedRecurrence(interval='DAY', offset=timedelta(hours=12), timezone=EASTERN),
+            LocalizedRecurrence(interval='MONTH', offset=timedelta(hours=15), timezone=EASTERN),
+        ])
 
     def test_update_all(self):
         """Calls to the model manager to update should be passed through.
         """
-        time = datetime(year=2013, month=5, day=20, hour=15, minute=3)
+        time = TIME_1503
         LocalizedRecurrence.objects.update_schedule(time=time)
-        self.assertTrue(all(r.next_scheduled > time for r in LocalizedRecurrence.objects.all()))
+        self.assertFalse(LocalizedRecurrence.objects.filter(next_scheduled__lte=time).exists())
+
+    def test_num_queries(self):
+        """The schedule should be updated with a single select and a single update.
+        """
+        LocalizedRecurrence.objects.create(interval='WEEK', offset=timedelta(hours=15), timezone=EASTERN)
+        time = TIME_1503
+        with self.assertNumQueries(2):
+            LocalizedRecurrence.objects.update_schedule(time=time)
+
+    def test_batches(self):
+        """Large numbers of recurrences are written in batches.
+        """
+        LocalizedRecurrence.objects.create(interval='WEEK', offset=timedelta(hours=15), timezone=EASTERN)
+        time = TIME_1503
+        with patch('localized_recurrence.models.UPDATE_BATCH_SIZE', 2), self.assertNumQueries(3):
+            LocalizedRecurrence.objects.update_schedule(time=time)
+        self.assertFalse(LocalizedRecurrence.objects.filter(next_scheduled__lte=time).exists())
 
 
 class LocalizedRecurrenceTest(TestCase):
     """Test the creation and querying of LocalizedRecurrence records.
     """
-    def setUp(self):
-        G(LocalizedRecurrence, interval='DAY', offset=timedelta(hours=12), timezone=pytz.timezone('US/Eastern'))
+    @classmethod
+    def setUpTestData(cls):
+        LocalizedRecurrence.objects.create(interval='DAY', offset=timedelta(hours=12), timezone=EASTERN)
 
     def test_timedelta_returned(self):
         """Test that the Duration field is correctly returning timedeltas.
         """
-        lr = LocalizedRecurrence.objects.first()
-        self.assertTrue(isinstance(lr.offset, timedelta))
+        offset = LocalizedRecurrence.objects.values_list('offset', flat=True).first()
+        self.assertTrue(isinstance(offset, timedelta))
 
     def test_string_representation(self):
         lr = LocalizedRecurrence.objects.first()
@@ -89,38 +159,89 @@ class LocalizedRecurrenceTest(TestCase):
 
 
 class LocalizedRecurrenceUpdateScheduleTest(TestCase):
-    def setUp(self):
-        self.lr_day = G(LocalizedRecurrence,
-                        interval='DAY', offset=timedelta(hours=12), timezone=pytz.timezone('US/Eastern'))
+    @classmethod
+    def setUpTestData(cls):
+        cls.lr_day = LocalizedRecurrence.objects.create(
+            interval='DAY', offset=timedelta(hours=12), timezone=EASTERN)
 
     def test_update_passes_through(self):
-        time = datetime(year=2013, month=5, day=20, hour=15, minute=3)
+        time = TIME_1503
         self.lr_day.update_schedule(time)
         self.assertGreater(self.lr_day.next_scheduled, time)
 
+    def test_update_persisted(self):
+        time = TIME_1503
+        self.lr_day.update_schedule(time)
+        lr_day = LocalizedRecurrence.objects.get(id=self.lr_day.id)
+        self.assertEqual(lr_day.next_scheduled, self.lr_day.next_scheduled)
+        self.assertEqual(lr_day.previous_scheduled, time)
+
+    def test_update_unsaved(self):
+        """Recurrences that have not been saved yet are created.
+        """
+        lr = LocalizedRecurrence(interval='DAY', offset=timedelta(hours=12), timezone=EASTERN)
+        lr.update_schedule(TIME_1503)
+        self.assertIsNotNone(lr.id)
+
+    def test_last_day_of_month(self):
+        """
+        Check dates for a full year where the utc time is the first and the time zone is the previous day
+        """
+        time_delta = timedelta(days=30, hours=23, minutes=3, seconds=3)
+        dt_start = datetime(2013, 2, 20, 23, 45, 48)
+        interval_name = 'MONTH'
+        timezone_name = 'US/Central'
+        recurrence = LocalizedRecurrence.objects.create(
+            interval=interval_name,
+            offset=time_delta,
+            timezone=timezone_name,
+            next_scheduled=dt_start,
+        )
+
+        # Check a full year of dates. The first next recurrence should be the month after it starts because
+        # The start time is weird because it should be set correctly to begin with. Setting it to 2-20 should not
+        # be happening. The app should initially set it to the correct first fire date
+        self.assertEqual(recurrence.next_scheduled, datetime(2013, 2, 20, 23, 45, 48))
+
+        expected_schedules = (
+            datetime(2013, 4, 1, 4, 3, 3),
+            datetime(2013, 5, 1, 4, 3, 3),
+            datetime(2013, 6, 1, 4, 3, 3),
+            datetime(2013, 7, 1, 4, 3, 3),
+            datetime(2013, 8, 1, 4, 3, 3),
+            datetime(2013, 9, 1, 4, 3, 3),
+            datetime(2013, 10, 1, 4, 3, 3),
+            datetime(2013, 11, 1, 4, 3, 3),
+            datetime(2013, 12, 1, 5, 3, 3),
+            datetime(2014, 1, 1, 5, 3, 3),
+            datetime(2014, 2, 1, 5, 3, 3),
+            datetime(2014, 3, 1, 5, 3, 3),
+            datetime(2014, 4, 1, 4, 3, 3),
+        )
+        for expected_schedule in expected_schedules:
+            recurrence.update_schedule(recurrence.next_scheduled)
+            with self.subTest(expected_schedule=expected_schedule):
+                self.assertEqual(recurrence.next_scheduled, expected_schedule)
+
 
 class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
-    def setUp(self):
-        self.lr_day = G(
-            LocalizedRecurrence,
+    @classmethod
+    def setUpTestData(cls):
+        cls.lr_day = LocalizedRecurrence.objects.create(
             interval='DAY', offset=timedelta(hours=12),
-            timezone=pytz.timezone('US/Eastern'))
-        self.lr_week = G(
-            LocalizedRecurrence,
+            timezone=EASTERN)
+        cls.lr_week = LocalizedRecurrence.objects.create(
             interval='WEEK', offset=timedelta(days=3, hours=17, minutes=30),
-            timezone=pytz.timezone('US/Central'))
-        self.lr_month = G(
-            LocalizedRecurrence,
+            timezone=CENTRAL)
+        cls.lr_month = LocalizedRecurrence.objects.create(
             interval='MONTH', offset=timedelta(days=21, hours=19, minutes=15, seconds=10),
-            timezone=pytz.timezone('US/Central'))
-        self.lr_quarter = G(
-            LocalizedRecurrence,
+            timezone=CENTRAL)
+        cls.lr_quarter = LocalizedRecurrence.objects.create(
             interval='QUARTER', offset=timedelta(days=68, hours=16, minutes=30),
-            timezone=pytz.timezone('Asia/Hong_Kong'))
-        self.lr_year = G(
-            LocalizedRecurrence,
+            timezone=HONG_KONG)
+        cls.lr_year = LocalizedRecurrence.objects.create(
             interval='YEAR', offset=timedelta(days=31, hours=16, minutes=30),
-            timezone=pytz.timezone('Asia/Hong_Kong'))
+            timezone=HONG_KONG)
 
     def test_basic_works(self):
         """
@@ -150,7 +271,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         - We then expect the next schedule in UTC to be 2013/1/16::05:0:0
         """
         self.lr_day.offset = timedelta(hours=23, minutes=59)
-        self.lr_day.save()
         current_time = datetime(2013, 1, 15, 5, 5, 22)
         expected_next_schedule = datetime(2013, 1, 16, 4, 59)
         schedule_out = self.lr_day.utc_of_next_schedule(current_time)
@@ -165,7 +285,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         - We then expect the next schedule in UTC to be 2013/1/16::05:01:0
         """
         self.lr_day.offset = timedelta(minutes=1)
-        self.lr_day.save()
         current_time = datetime(2013, 1, 15, 5, 5, 22)
         expected_next_schedule = datetime(2013, 1, 16, 5, 1)
         schedule_out = self.lr_day.utc_of_next_schedule(current_time)
@@ -249,12 +368,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         current_time = datetime(2013, 6, 23, 0, 34, 55)
         expected_next_schedule = datetime(2013, 9, 7, 8, 30)
         schedule_out = self.lr_quarter.utc_of_next_schedule(current_time)
-        self.lr_quarter = G(
-            LocalizedRecurrence,
-            interval='QUARTER',
-            offset=timedelta(days=68, hours=16, minutes=30),
-            timezone=pytz.timezone('Asia/Hong_Kong')
-        )
         self.assertEqual(schedule_out, expected_next_schedule)
 
     def test_quarterly_current_quarter(self):
@@ -268,14 +381,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         current_time = datetime(2013, 4, 23, 0, 34, 55)
         expected_next_schedule = datetime(2013, 6, 8, 8, 30)
         schedule_out = self.lr_quarter.utc_of_next_schedule(current_time)
-
-        self.lr_quarter = G(
-            LocalizedRecurrence,
-            interval='QUARTER',
-            offset=timedelta(days=68, hours=16, minutes=30),
-            timezone=pytz.timezone('Asia/Hong_Kong')
-        )
-
         self.assertEqual(schedule_out, expected_next_schedule)
 
     def test_quarterly_end_year(self):
@@ -289,12 +394,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         current_time = datetime(2013, 12, 23, 0, 34, 55)
         expected_next_schedule = datetime(2014, 3, 10, 8, 30)
         schedule_out = self.lr_quarter.utc_of_next_schedule(current_time)
-        self.lr_quarter = G(
-            LocalizedRecurrence,
-            interval='QUARTER',
-            offset=timedelta(days=68, hours=16, minutes=30),
-            timezone=pytz.timezone('Asia/Hong_Kong')
-        )
         self.assertEqual(schedule_out, expected_next_schedule)
 
     def test_yearly(self):
@@ -321,7 +420,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         - Weekly recurence, every Thursday at Noon EST.
         """
         self.lr_week.offset = timedelta(days=3, hours=12)
-        self.lr_week.save()
         current_time = datetime(2013, 3, 7, 18)
         expected_next_schedule = datetime(2013, 3, 14, 17)
         schedule_out = self.lr_week.utc_of_next_schedule(current_time)
@@ -338,7 +436,6 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
         - Weekly recurence, every Thursday at Noon EST.
         """
         self.lr_week.offset = timedelta(days=3, hours=12)
-        self.lr_week.save()
         current_time = datetime(2013, 10, 31, 17)
         expected_next_schedule = datetime(2013, 11, 7, 18)
         schedule_out = self.lr_week.utc_of_next_schedule(current_time)
@@ -350,8 +447,7 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
 
         - Europe/Berlin DST is UTC + 2
         """
-        self.lr_day.timezone = pytz.timezone('Europe/Berlin')
-        self.lr_day.save()
+        self.lr_day.timezone = BERLIN
         current_time = datetime(2013, 5, 5, 10, 10)
         expected_next_schedule = datetime(2013, 5, 6, 10)
         schedule_out = self.lr_day.utc_of_next_schedule(current_time)
@@ -359,185 +455,117 @@ class LocalizedRecurrenceUtcOfNextScheduleTest(TestCase):
 
 
 class UpdateScheduleTest(TestCase):
-    def setUp(self):
-        self.lr_week = G(
-            LocalizedRecurrence,
+    @classmethod
+    def setUpTestData(cls):
+        cls.lr_week = LocalizedRecurrence.objects.create(
             interval='WEEK', offset=timedelta(hours=12),
-            timezone=pytz.timezone('US/Eastern'))
-        self.lr_day = G(
-            LocalizedRecurrence,
+            timezone=EASTERN)
+        cls.lr_day = LocalizedRecurrence.objects.create(
             interval='DAY',
             offset=timedelta(hours=12),
-            timezone=pytz.timezone('US/Eastern'))
+            timezone=EASTERN)
 
     def test_updates_localized_recurrences(self):
-        time = datetime(year=2013, month=5, day=20, hour=12, minute=3)
+        time = TIME_1203
         _update_schedule([self.lr_week], time)
         self.assertGreater(self.lr_week.next_scheduled, time)
         self.assertEqual(self.lr_week.previous_scheduled, time)
 
+    def test_queryset_skips_future_recurrences(self):
+        """Querysets do not reschedule or write recurrences that are not due yet.
+        """
+        time = TIME_1203
+        self.lr_week.update(next_scheduled=datetime(2013, 5, 21), previous_scheduled=datetime(2013, 5, 14))
+        recurrences = LocalizedRecurrence.objects.filter(id=self.lr_week.id)
+        with self.assertNumQueries(1):
+            recurrences.update_schedule(time)
+        lr_week = recurrences.get()
+        self.assertEqual(lr_week.next_scheduled, datetime(2013, 5, 21))
+        self.assertEqual(lr_week.previous_scheduled, datetime(2013, 5, 14))
+
+        # Evaluated querysets leave their cached future recurrences alone as well
+        list(recurrences)
+        with self.assertNumQueries(0):
+            recurrences.update_schedule(time)
+        self.assertEqual(recurrences[0].previous_scheduled, datetime(2013, 5, 14))
+
+    def test_sliced_queryset(self):
+        """Sliced querysets can be updated and still skip recurrences that are not due yet.
+        """
+        time = TIME_1203
+        self.lr_week.update(next_scheduled=datetime(2013, 5, 21), previous_scheduled=datetime(2013, 5, 14))
+        with self.assertNumQueries(2):
+            LocalizedRecurrence.objects.order_by('id')[:2].update_schedule(time)
+        lr_week, lr_day = LocalizedRecurrence.objects.filter(id__in=[self.lr_week.id, self.lr_day.id]).order_by('id')
+        self.assertEqual(lr_week.previous_scheduled, datetime(2013, 5, 14))
+        self.assertEqual(lr_day.previous_scheduled, time)
+        self.assertGreater(lr_day.next_scheduled, time)
 
-class ReplaceWithOffsetTest(TestCase):
-    def test_day(self):
-        """
-        _replace_with_offset works as expected with a 'DAY' interval.
-        """
-        dt_in = datetime(2013, 1, 20, 12, 45, 48)
-        td_in = timedelta(hours=3, minutes=3, seconds=3)
-        interval_in = 'DAY'
-        dt_expected = datetime(2013, 1, 20, 3, 3, 3)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_out, dt_expected)
-
-    def test_week(self):
-        """
-        _replace_with_offset works as expected with a 'WEEK' interval.
-        """
-        dt_in = datetime(2013, 1, 20, 12, 45, 48)
-        td_in = timedelta(days=4, hours=3, minutes=3, seconds=3)
-        interval_in = 'WEEK'
-        dt_expected = datetime(2013, 1, 18, 3, 3, 3)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_out, dt_expected)
-
-    def test_week_on_month_boundary(self):
-        """
-        _replace_with_offset using interval 'WEEK' should roll over months
-        correctly.
-        """
-        dt_in = datetime(2013, 7, 30, 12, 45, 48)
-        td_in = timedelta(days=4, hours=3, minutes=3, seconds=3)
-        interval_in = 'WEEK'
-        dt_expected = datetime(2013, 8, 2, 3, 3, 3)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_out, dt_expected)
-
-    def test_month(self):
-        """
-        _replace_with_offset works as expected with a 'MONTH' interval.
+    def test_records_check_time_when_not_due(self):
+        """Updating a single recurrence always records when its schedule was checked.
         """
-        dt_in = datetime(2013, 1, 20, 12, 45, 48)
-        td_in = timedelta(days=15, hours=3, minutes=3, seconds=3)
-        interval_in = 'MONTH'
-        dt_expected = datetime(2013, 1, 16, 3, 3, 3)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_out, dt_expected)
+        time = TIME_1203
+        self.lr_week.update(next_scheduled=datetime(2013, 5, 21), previous_scheduled=datetime(2013, 5, 14))
+        self.lr_week.update_schedule(time)
+        self.assertEqual(self.lr_week.next_scheduled, datetime(2013, 5, 21))
+        self.assertEqual(self.lr_week.previous_scheduled, time)
 
-    def test_last_day_of_month(self):
+    def test_shared_schedules_cached(self):
+        """Recurrences with the same schedule only compute it once.
         """
-        Check dates for a full year where the utc time is the first and the time zone is the previous day
-        """
-        time_delta = timedelta(days=30, hours=23, minutes=3, seconds=3)
-        dt_start = datetime(2013, 2, 20, 23, 45, 48)
-        interval_name = 'MONTH'
-        timezone_name = 'US/Central'
-        recurrence = LocalizedRecurrence.objects.create(
-            interval=interval_name,
-            offset=time_delta,
-            timezone=timezone_name,
-            next_scheduled=dt_start,
+        lr_day2 = LocalizedRecurrence.objects.create(
+            interval='DAY',
+            offset=timedelta(hours=12),
+            timezone=EASTERN)
+        time = TIME_1203
+        _utc_of_next_schedule.cache_clear()
+        _update_schedule([self.lr_day, lr_day2], time)
+        self.assertEqual(_utc_of_next_schedule.cache_info().hits, 1)
+        self.assertEqual(self.lr_day.next_scheduled, lr_day2.next_scheduled)
+
+    def test_writes_to_recurrence_database(self):
+        """Schedules are written to the database the recurrences came from.
+        """
+        self.lr_week._state.db = 'other'
+        with patch.object(LocalizedRecurrence.objects, 'db_manager') as db_manager:
+            _update_schedule([self.lr_week], TIME_1203)
+        db_manager.assert_called_once_with('other')
+        db_manager.return_value.bulk_update.assert_called_once_with(
+            [self.lr_week], ['next_scheduled', 'previous_scheduled'], batch_size=10000)
+
+
+class ReplaceWithOffsetTest(SimpleTestCase):
+    def test_replace_with_offset(self):
+        """
+        _replace_with_offset moves a time to the offset into its interval.
+        """
+        cases = (
+            ('day', datetime(2013, 1, 20, 12, 45, 48), timedelta(hours=3, minutes=3, seconds=3), 'DAY',
+             datetime(2013, 1, 20, 3, 3, 3)),
+            ('week', datetime(2013, 1, 20, 12, 45, 48), timedelta(days=4, hours=3, minutes=3, seconds=3), 'WEEK',
+             datetime(2013, 1, 18, 3, 3, 3)),
+            ('week_on_month_boundary', datetime(2013, 7, 30, 12, 45, 48),
+             timedelta(days=4, hours=3, minutes=3, seconds=3), 'WEEK', datetime(2013, 8, 2, 3, 3, 3)),
+            ('month', datetime(2013, 1, 20, 12, 45, 48), timedelta(days=15, hours=3, minutes=3, seconds=3), 'MONTH',
+             datetime(2013, 1, 16, 3, 3, 3)),
+            ('quarter', datetime(2013, 4, 20, 12, 45, 48), timedelta(days=65, hours=3, minutes=3, seconds=3),
+             'QUARTER', datetime(2013, 6, 5, 3, 3, 3)),
+            ('quarterly_past', datetime(2013, 6, 23, 0, 34, 55), timedelta(days=68, hours=16, minutes=30), 'QUARTER',
+             datetime(2013, 6, 8, 16, 30)),
+            ('quarterly_overshoot', datetime(2013, 1, 1, 0), timedelta(days=90, hours=12), 'QUARTER',
+             datetime(2013, 3, 31, 12)),
+            ('quarterly_undershoot', datetime(2013, 7, 1, 0), timedelta(days=90, hours=12), 'QUARTER',
+             datetime(2013, 9, 29, 12)),
+            ('year', datetime(2013, 6, 23, 0, 34, 55), timedelta(days=5, hours=16, minutes=30), 'YEAR',
+             datetime(2013, 1, 6, 16, 30)),
+            ('year_end_leap_year', datetime(2016, 6, 23, 0, 34, 55), timedelta(days=365, hours=16, minutes=30),
+             'YEAR', datetime(2016, 12, 31, 16, 30)),
+            ('year_end_non_leap_year', datetime(2015, 6, 23, 0, 34, 55), timedelta(days=365, hours=16, minutes=30),
+             'YEAR', datetime(2015, 12, 31, 16, 30)),
         )
-
-        # Check a full year of dates. The first next recurrence should be the month after it starts because
-        # The start time is weird because it should be set correctly to begin with. Setting it to 2-20 should not
-        # be happening. The app should initially set it to the correct first fire date
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 2, 20, 23, 45, 48))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 4, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 5, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 6, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 7, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 8, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 9, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 10, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 11, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2013, 12, 1, 5, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2014, 1, 1, 5, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2014, 2, 1, 5, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2014, 3, 1, 5, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-        self.assertEqual(recurrence.next_scheduled, datetime(2014, 4, 1, 4, 3, 3))
-        recurrence.update_schedule(recurrence.next_scheduled)
-
-    def test_quarter(self):
-        dt_in = datetime(2013, 4, 20, 12, 45, 48)
-        td_in = timedelta(days=65, hours=3, minutes=3, seconds=3)
-        interval_in = 'QUARTER'
-        dt_expected = datetime(2013, 6, 5, 3, 3, 3)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_out, dt_expected)
-
-    def test_quarterly_past(self):
-        dt_in = datetime(2013, 6, 23, 0, 34, 55)
-        td_in = timedelta(days=68, hours=16, minutes=30)
-        interval_in = 'QUARTER'
-        dt_expected = datetime(2013, 6, 8, 16, 30)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
-
-    def test_quarterly_overshoot(self):
-        dt_in = datetime(2013, 1, 1, 0)
-        td_in = timedelta(days=90, hours=12)
-        interval_in = 'QUARTER'
-        dt_expected = datetime(2013, 3, 31, 12)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
-
-    def test_quarterly_undershoot(self):
-        dt_in = datetime(2013, 7, 1, 0)
-        td_in = timedelta(days=90, hours=12)
-        interval_in = 'QUARTER'
-        dt_expected = datetime(2013, 9, 29, 12)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
-
-    def test_year(self):
-        dt_in = datetime(2013, 6, 23, 0, 34, 55)
-        td_in = timedelta(days=5, hours=16, minutes=30)
-        interval_in = 'YEAR'
-        dt_expected = datetime(2013, 1, 6, 16, 30)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
-
-    def test_year_end_leap_year(self):
-        dt_in = datetime(2016, 6, 23, 0, 34, 55)
-        td_in = timedelta(days=365, hours=16, minutes=30)
-        interval_in = 'YEAR'
-        dt_expected = datetime(2016, 12, 31, 16, 30)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
-
-    def test_year_end_non_leap_year(self):
-        dt_in = datetime(2015, 6, 23, 0, 34, 55)
-        td_in = timedelta(days=365, hours=16, minutes=30)
-        interval_in = 'YEAR'
-        dt_expected = datetime(2015, 12, 31, 16, 30)
-        dt_out = _replace_with_offset(dt_in, td_in, interval_in)
-        self.assertEqual(dt_expected, dt_out)
+        for name, dt_in, td_in, interval_in, dt_expected in cases:
+            with self.subTest(name):
+                self.assertEqual(_replace_with_offset(dt_in, td_in, interval_in), dt_expected)
 
     def test_bad_interval(self):
         """
@@ -27,12 +27,19 @@ def configure_settings():
                 'PASSWORD': '',
                 'HOST': 'db',
             }
+        elif test_db == 'sqlite':
+            # An in-memory database for fast local runs that do not need postgres
+            db_config = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            }
         else:
             raise RuntimeError('Unsupported test DB {0}'.format(test_db))
 
         # Check env for db override (used for github actions)
-        if os.environ.get('DB_SETTINGS'):
-            db_config = json.loads(os.environ.get('DB_SETTINGS'))
+        db_settings = os.environ.get('DB_SETTINGS')
+        if db_settings:
+            db_config = json.loads(db_settings)
 
         settings.configure(
             TEST_RUNNER='django_nose.NoseTestSuiteRunner',
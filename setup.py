@@ -1,24 +1,35 @@
 import re
 from setuptools import setup, find_packages
 
-import multiprocessing
-assert multiprocessing
+
+VERSION_FILE = 'localized_recurrence/version.py'
+VERSION_RE = re.compile(r'^__version__ = [\'"]([^\'"]*)[\'"]', re.M)
 
 
 def get_version():
     """
     Extracts the version number from the version.py file.
     """
-    VERSION_FILE = 'localized_recurrence/version.py'
-    mo = re.search(r'^__version__ = [\'"]([^\'"]*)[\'"]', open(VERSION_FILE, 'rt').read(), re.M)
+    with open(VERSION_FILE, 'rt') as version_file:
+        mo = VERSION_RE.search(version_file.read())
     if mo:
         return mo.group(1)
     else:
         raise RuntimeError('Unable to find version string in {0}.'.format(VERSION_FILE))
 
 
+def get_long_description():
+    with open('README.rst', 'r') as readme:
+        return readme.read()
+
+
 def get_lines(file_path):
-    return open(file_path, 'r').read().split('\n')
+    """
+    Returns the requirements listed in a requirements file, skipping blank lines and comments.
+    """
+    with open(file_path, 'r') as requirements_file:
+        lines = (line.strip() for line in requirements_file)
+        return [line for line in lines if line and not line.startswith('#')]
 
 
 install_requires = get_lines('requirements/requirements.txt')
@@ -33,7 +44,7 @@ setup(
     zip_safe=False,
     license='MIT License',
     description='Store events that recur in users\' local times.',
-    long_description=open('README.rst').read(),
+    long_description=get_long_description(),
     author='Erik Swanson',
     author_email='theerikswanson@gmail.com',
     classifiers=[